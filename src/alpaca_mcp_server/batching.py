@@ -0,0 +1,227 @@
+"""
+Request coalescing for single-symbol calls to multi-symbol endpoints.
+
+Agents often fan out one tool call per symbol in the same turn. The latest
+market data endpoints accept a comma-separated ``symbols`` list, so calls
+arriving within a short window are merged into one upstream request and the
+per-symbol mapping in the response is split back out to each caller.
+
+Tools opt in via ``ToolDefinition.coalesce_key``, which names the response
+field holding the per-symbol mapping. The same mapping lets a call naming
+more symbols than one request may carry be split into concurrent chunks
+and merged back into a single response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import httpx
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from .symbols import split_symbols
+from .tool_registry import TOOLS_BY_NAME
+
+DEFAULT_WINDOW_SECONDS = 0.02
+DEFAULT_MAX_BATCH = 100
+
+# Statuses one malformed or unknown symbol can cause for a whole merged
+# request. Rate limits, 5xx and timeouts hit every caller alike, and the
+# transport has already retried them.
+SYMBOL_ERROR_STATUSES = frozenset({400, 422})
+
+
+class _PendingBatch:
+    """Single-symbol calls waiting to be merged into one upstream request."""
+
+    def __init__(self, context: MiddlewareContext, call_next, key: str) -> None:
+        self.context = context
+        self.call_next = call_next
+        self.key = key
+        self.waiters: dict[str, list[asyncio.Future]] = {}
+        self.timer: asyncio.TimerHandle | None = None
+
+    def add(self, symbol: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(symbol, []).append(future)
+        return future
+
+    def resolve(self, symbol: str, result: ToolResult) -> None:
+        for future in self.waiters[symbol]:
+            if not future.done():
+                future.set_result(result)
+
+    def reject(self, symbol: str, exc: BaseException) -> None:
+        for future in self.waiters[symbol]:
+            if not future.done():
+                future.set_exception(exc)
+
+    def fail(self, exc: BaseException) -> None:
+        for symbol in self.waiters:
+            self.reject(symbol, exc)
+
+
+def _with_symbols(context: MiddlewareContext, symbols: list[str]) -> MiddlewareContext:
+    message = context.message
+    arguments = {**(message.arguments or {}), "symbols": ",".join(symbols)}
+    return context.copy(message=message.model_copy(update={"arguments": arguments}))
+
+
+def _upstream_status(exc: BaseException) -> int | None:
+    """HTTP status behind a tool failure, found through its ``__cause__`` chain."""
+    cause: BaseException | None = exc
+    while cause is not None:
+        if isinstance(cause, httpx.HTTPStatusError):
+            return cause.response.status_code
+        cause = cause.__cause__
+    return None
+
+
+def _group_key(tool_name: str, arguments: dict[str, Any]) -> str:
+    """Calls may only be merged when every argument except symbols matches."""
+    rest = {k: v for k, v in arguments.items() if k != "symbols"}
+    return tool_name + ":" + json.dumps(rest, sort_keys=True, default=str)
+
+
+def _split_result(
+    shared: dict[str, Any],
+    key: str,
+    mapping: dict[str, Any],
+    symbol: str,
+    meta: dict[str, Any] | None,
+) -> ToolResult:
+    # The API echoes symbols in canonical (upper) case.
+    for candidate in (symbol, symbol.upper()):
+        if candidate in mapping:
+            return ToolResult(
+                structured_content={**shared, key: {candidate: mapping[candidate]}},
+                meta=meta,
+            )
+    return ToolResult(structured_content={**shared, key: {}}, meta=meta)
+
+
+class SymbolCoalescingMiddleware(Middleware):
+    """Merges concurrent single-symbol calls into one multi-symbol request."""
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW_SECONDS,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ) -> None:
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[str, _PendingBatch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next) -> ToolResult:
+        tool_name = context.message.name
+        definition = TOOLS_BY_NAME.get(tool_name)
+        arguments = context.message.arguments or {}
+        symbols = arguments.get("symbols")
+        if definition is None or definition.coalesce_key is None or not isinstance(symbols, str):
+            return await call_next(context)
+        key = definition.coalesce_key
+        requested = split_symbols(symbols)
+        if len(requested) > self.max_batch:
+            return await self._call_chunked(context, call_next, key, requested)
+        if len(requested) != 1:
+            return await call_next(context)
+
+        group = _group_key(tool_name, arguments)
+        batch = self._pending.get(group)
+        if batch is None:
+            batch = _PendingBatch(context, call_next, key)
+            self._pending[group] = batch
+            batch.timer = asyncio.get_running_loop().call_later(
+                self.window, self._start_flush, group, batch
+            )
+
+        future = batch.add(requested[0])
+        if len(batch.waiters) >= self.max_batch:
+            assert batch.timer is not None
+            batch.timer.cancel()
+            self._start_flush(group, batch)
+        return await future
+
+    def _start_flush(self, group: str, batch: _PendingBatch) -> None:
+        if self._pending.get(group) is batch:
+            del self._pending[group]
+        task = asyncio.get_running_loop().create_task(self._flush(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _call_chunked(
+        self,
+        context: MiddlewareContext,
+        call_next,
+        key: str,
+        symbols: list[str],
+    ) -> ToolResult:
+        """Fetch an over-limit symbol list as concurrent max_batch-sized requests."""
+        chunks = [
+            symbols[i : i + self.max_batch] for i in range(0, len(symbols), self.max_batch)
+        ]
+        results = await asyncio.gather(
+            *(call_next(_with_symbols(context, chunk)) for chunk in chunks)
+        )
+        mapping: dict[str, Any] = {}
+        for result in results:
+            content = result.structured_content
+            if not isinstance(content, dict) or not isinstance(content.get(key), dict):
+                # An error payload for any chunk is the answer for the call.
+                return result
+            mapping.update(content[key])
+        first = results[0]
+        return ToolResult(
+            structured_content={**first.structured_content, key: mapping},
+            meta=first.meta,
+        )
+
+    async def _flush(self, batch: _PendingBatch) -> None:
+        try:
+            result = await batch.call_next(_with_symbols(batch.context, list(batch.waiters)))
+        except Exception as exc:
+            if len(batch.waiters) > 1 and _upstream_status(exc) in SYMBOL_ERROR_STATUSES:
+                await self._call_individually(batch)
+            else:
+                batch.fail(exc)
+            return
+
+        key = batch.key
+        content = result.structured_content
+        if (
+            len(batch.waiters) == 1
+            or not isinstance(content, dict)
+            or not isinstance(content.get(key), dict)
+        ):
+            for symbol in batch.waiters:
+                batch.resolve(symbol, result)
+            return
+
+        # Fields outside the per-symbol mapping (e.g. currency) are identical
+        # for every caller, so copy them once rather than once per symbol.
+        mapping = content[key]
+        shared = {k: v for k, v in content.items() if k != key}
+        for symbol in batch.waiters:
+            batch.resolve(symbol, _split_result(shared, key, mapping, symbol, result.meta))
+
+    async def _call_individually(self, batch: _PendingBatch) -> None:
+        """Re-issue each waiter's call on its own after a symbol-level rejection.
+
+        The API rejects a whole request for one bad symbol, so that failure
+        must not reach callers whose own symbols are valid, nor show them
+        another caller's input.
+        """
+        symbols = list(batch.waiters)
+        outcomes = await asyncio.gather(
+            *(batch.call_next(_with_symbols(batch.context, [symbol])) for symbol in symbols),
+            return_exceptions=True,
+        )
+        for symbol, outcome in zip(symbols, outcomes):
+            if isinstance(outcome, BaseException):
+                batch.reject(symbol, outcome)
+            else:
+                batch.resolve(symbol, outcome)
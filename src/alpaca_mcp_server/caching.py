@@ -0,0 +1,228 @@
+"""
+Short-lived response cache for read-only market data tools.
+
+Agents frequently re-query the same quote or snapshot within a few seconds
+while reasoning. Each repeat costs a full HTTPS round trip and a rate-limit
+token, so tools that opt in via ``ToolDefinition.cache_ttl`` are answered
+from an in-process TTL cache instead.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from .symbols import split_symbols
+from .tool_registry import TOOLS_BY_NAME
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 4096
+
+# Entry count alone does not bound memory once multi-day history is cached;
+# cap the summed size of stored payloads as well.
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Bars newer than this may still be revised by late prints; never cache them.
+CLOSED_WINDOW_GRACE = timedelta(minutes=1)
+
+# Cached results whose JSON is at least this large are stored compressed.
+# Multi-day bar/trade payloads are highly repetitive and shrink several-fold,
+# so far more of them fit in the cache; small quotes are not worth the CPU.
+COMPRESS_MIN_BYTES = 4096
+
+# RFC 3339 allows nanosecond fractions; datetime only holds microseconds.
+_EXCESS_FRACTION_PATTERN = re.compile(r"(\.\d{6})\d+", re.ASCII)
+
+
+class TTLCache:
+    """LRU mapping bounded by entry count and total size; entries expire after a TTL."""
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        # Min-heap of (expires_at, seq, key). TTLs range from seconds to an
+        # hour, so LRU order says nothing about which entries have expired.
+        # Heap items for replaced or evicted entries are skipped when popped.
+        self._expiry: list[tuple[float, int, Hashable]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= self._clock():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: int = 0) -> None:
+        """Store ``value``; ``size`` is its approximate footprint in bytes."""
+        self._discard(key)
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+        self._purge_expired(now)
+        expires_at = now + ttl
+        self._entries[key] = (expires_at, value, size)
+        heapq.heappush(self._expiry, (expires_at, next(self._seq), key))
+        self.nbytes += size
+        while len(self._entries) > self.maxsize or self.nbytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expiry.clear()
+        self.nbytes = 0
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop expired entries, including ones that are never read again."""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                self._discard(key)
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[2]
+
+
+# Agents repeat the same explicit window across calls; datetimes are
+# immutable, so parsed results are safe to share.
+@lru_cache(maxsize=256)
+def _parse_timestamp(value: str) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        # Python < 3.11 rejects a trailing "Z", and no version accepts
+        # sub-microsecond fractions; normalize both and retry once.
+        normalized = _EXCESS_FRACTION_PATTERN.sub(r"\1", value.replace("Z", "+00:00"))
+        try:
+            parsed = datetime.fromisoformat(normalized)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _window_is_closed(arguments: dict[str, Any], now: datetime) -> bool:
+    """True when the request has an explicit ``end`` safely in the past."""
+    end = arguments.get("end")
+    if not isinstance(end, str):
+        return False
+    end_time = _parse_timestamp(end)
+    if end_time is None:
+        return False
+    return end_time < now - CLOSED_WINDOW_GRACE
+
+
+def _normalize_symbols(value: Any) -> Any:
+    if isinstance(value, str):
+        return ",".join(sorted(split_symbols(value)))
+    return value
+
+
+def _cache_key(tool_name: str, arguments: dict[str, Any]) -> str:
+    """Stable key for a tool call; symbol order does not affect the result."""
+    normalized = dict(arguments)
+    if "symbols" in normalized:
+        normalized["symbols"] = _normalize_symbols(normalized["symbols"])
+    return tool_name + ":" + json.dumps(normalized, sort_keys=True, default=str)
+
+
+def _is_cacheable_result(result: ToolResult) -> bool:
+    content = result.structured_content
+    return isinstance(content, dict) and "error" not in content
+
+
+class _CompressedResult:
+    """A large cached ToolResult held as zlib-compressed JSON."""
+
+    __slots__ = ("blob", "meta")
+
+    def __init__(self, blob: bytes, meta: dict[str, Any] | None) -> None:
+        self.blob = blob
+        self.meta = meta
+
+    def restore(self) -> ToolResult:
+        content = json.loads(zlib.decompress(self.blob))
+        return ToolResult(structured_content=content, meta=self.meta)
+
+
+def _pack(result: ToolResult) -> tuple[ToolResult | _CompressedResult, int]:
+    """Cache entry for ``result`` and its approximate size in bytes."""
+    raw = json.dumps(result.structured_content, separators=(",", ":"), default=str).encode()
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return result, len(raw)
+    # Level 1: most of the size reduction at a fraction of the default's cost.
+    blob = zlib.compress(raw, 1)
+    return _CompressedResult(blob, result.meta), len(blob)
+
+
+def _unpack(entry: ToolResult | _CompressedResult) -> ToolResult:
+    if isinstance(entry, _CompressedResult):
+        return entry.restore()
+    return entry
+
+
+class ResponseCacheMiddleware(Middleware):
+    """Serves repeat calls to cacheable tools from a TTL cache."""
+
+    def __init__(self, cache: TTLCache | None = None) -> None:
+        self.cache = cache if cache is not None else TTLCache()
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next) -> ToolResult:
+        tool_name = context.message.name
+        definition = TOOLS_BY_NAME.get(tool_name)
+        if definition is None or definition.cache_ttl is None:
+            return await call_next(context)
+
+        arguments = context.message.arguments or {}
+        # context.timestamp is the UTC receipt time of this request; reuse it
+        # rather than reading the wall clock again.
+        if definition.cache_closed_window_only and not _window_is_closed(
+            arguments, context.timestamp
+        ):
+            return await call_next(context)
+
+        key = _cache_key(tool_name, arguments)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug("cache hit: %s", key)
+            return _unpack(cached)
+
+        logger.debug("cache miss: %s", key)
+        result = await call_next(context)
+        if _is_cacheable_result(result):
+            entry, size = _pack(result)
+            self.cache.set(key, entry, definition.cache_ttl, size)
+        return result
@@ -11,18 +11,28 @@ from __future__ import annotations
 
 import re
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
 import httpx
 from fastmcp import FastMCP
 
+from .symbols import split_symbols
+
 _TIMEFRAME_ALIASES: dict[str, str] = {
     "1min": "1Min", "5min": "5Min", "15min": "15Min", "30min": "30Min",
     "1hour": "1Hour", "4hour": "4Hour",
     "1day": "1Day", "1week": "1Week", "1month": "1Month",
 }
 
-_TIMEFRAME_PATTERN = re.compile(r"^(\d+)(min|hour|day|week|month)$")
+_TIMEFRAME_UNITS: dict[str, str] = {
+    "min": "Min", "hour": "Hour", "day": "Day", "week": "Week", "month": "Month",
+}
+
+# ASCII-only: \d would otherwise accept non-ASCII digits the API rejects.
+_TIMEFRAME_PATTERN = re.compile(
+    r"^(\d+)(" + "|".join(_TIMEFRAME_UNITS) + r")$", re.ASCII
+)
 
 
 def _relative_start(days: int = 0, hours: int = 0, minutes: int = 0) -> str | None:
@@ -36,6 +46,14 @@ def _relative_start(days: int = 0, hours: int = 0, minutes: int = 0) -> str | No
     return start.strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+def _resolve_start(start: str | None, days: int, hours: int, minutes: int) -> str | None:
+    """Explicit start if given, otherwise the relative lookback from now."""
+    if start is not None:
+        return start
+    return _relative_start(days=days, hours=hours, minutes=minutes)
+
+
+@lru_cache(maxsize=128)
 def _normalize_timeframe(tf: str) -> str:
     """Map case variants (e.g. '2hour') to API-expected format ('2Hour')."""
     lower = tf.lower().strip()
@@ -44,10 +62,17 @@ def _normalize_timeframe(tf: str) -> str:
         return alias
     m = _TIMEFRAME_PATTERN.match(lower)
     if m:
-        return m.group(1) + m.group(2).capitalize()
+        return m.group(1) + _TIMEFRAME_UNITS[m.group(2)]
     return tf
 
 
+# Free and paper data plans get HTTP 403 for SIP data newer than 15 minutes.
+_SIP_SUBSCRIPTION_HINT = (
+    "Your data plan does not include recent SIP data. Retry with feed=\"iex\", "
+    "or set end to at least 15 minutes ago."
+)
+
+
 def _error(message: str, **extra: object) -> dict:
     err: dict = {"message": message}
     err.update(extra)
@@ -57,6 +82,13 @@ def _error(message: str, **extra: object) -> dict:
 async def _get(client: httpx.AsyncClient, path: str, params: dict) -> dict:
     """GET request with error handling matching the order override pattern."""
     params = {k: v for k, v in params.items() if v is not None}
+    symbols = params.get("symbols")
+    if isinstance(symbols, str):
+        requested = split_symbols(symbols)
+        if not requested:
+            # The API would reject this with a 400; skip the round trip.
+            return _error("At least one symbol is required (e.g. \"AAPL\" or \"BTC/USD\").")
+        params["symbols"] = ",".join(requested)
     try:
         resp = await client.get(path, params=params)
     except httpx.ReadTimeout:
@@ -72,11 +104,10 @@ async def _get(client: httpx.AsyncClient, path: str, params: dict) -> dict:
             detail = resp.json()
         except Exception:
             detail = {"raw": resp.text}
-        return _error(
-            "Market data API error",
-            http_status=resp.status_code,
-            detail=detail,
-        )
+        extra: dict = {"http_status": resp.status_code, "detail": detail}
+        if resp.status_code == 403 and "sip" in resp.text.lower():
+            extra["hint"] = _SIP_SUBSCRIPTION_HINT
+        return _error("Market data API error", **extra)
     try:
         return resp.json()
     except Exception:
@@ -107,6 +138,7 @@ def register_market_data_tools(
         hours: int = 0,
         minutes: int = 0,
         limit: int = 1000,
+        page_token: Optional[str] = None,
         adjustment: str = "raw",
         feed: Optional[str] = None,
         currency: Optional[str] = None,
@@ -129,6 +161,10 @@ def register_market_data_tools(
             minutes: Additional minutes in the lookback (default 0).
             limit: Max total data points returned across all symbols,
                    1–10000 (default 1000).
+            page_token: next_page_token from a previous response, to fetch
+                        the following page instead of raising limit. Pass
+                        an explicit start when paging; a relative lookback
+                        moves with the clock between calls.
             adjustment: Price adjustment — "raw", "split", "dividend",
                         "spin-off", or "all". Comma-separated combos allowed
                         (e.g. "split,dividend"). Default "raw".
@@ -139,14 +175,13 @@ def register_market_data_tools(
             asof: As-of date (YYYY-MM-DD) for point-in-time symbol mapping.
                   Useful for backtesting with historical ticker changes.
         """
-        if start is None:
-            start = _relative_start(days=days, hours=hours, minutes=minutes)
         return await _get(client, "/v2/stocks/bars", {
             "symbols": symbols,
             "timeframe": _normalize_timeframe(timeframe),
-            "start": start,
+            "start": _resolve_start(start, days, hours, minutes),
             "end": end,
             "limit": limit,
+            "page_token": page_token,
             "adjustment": adjustment,
             "feed": feed,
             "currency": currency,
@@ -169,6 +204,7 @@ def register_market_data_tools(
         hours: int = 0,
         minutes: int = 20,
         limit: int = 1000,
+        page_token: Optional[str] = None,
         feed: Optional[str] = None,
         currency: Optional[str] = None,
         sort: str = "asc",
@@ -188,6 +224,10 @@ def register_market_data_tools(
             minutes: Additional minutes in the lookback (default 20).
             limit: Max total data points returned across all symbols,
                    1–10000 (default 1000).
+            page_token: next_page_token from a previous response, to fetch
+                        the following page instead of raising limit. Pass
+                        an explicit start when paging; a relative lookback
+                        moves with the clock between calls.
             feed: Data feed — "sip" (all US exchanges, default, paid),
                   "iex" (free tier), "otc", or "boats".
                   Paper/free accounts must set feed="iex" to avoid 403 errors.
@@ -195,13 +235,12 @@ def register_market_data_tools(
             sort: Timestamp sort order — "asc" (default) or "desc".
             asof: As-of date (YYYY-MM-DD) for point-in-time symbol mapping.
         """
-        if start is None:
-            start = _relative_start(days=days, hours=hours, minutes=minutes)
         return await _get(client, "/v2/stocks/quotes", {
             "symbols": symbols,
-            "start": start,
+            "start": _resolve_start(start, days, hours, minutes),
             "end": end,
             "limit": limit,
+            "page_token": page_token,
             "feed": feed,
             "currency": currency,
             "sort": sort,
@@ -223,6 +262,7 @@ def register_market_data_tools(
         hours: int = 0,
         minutes: int = 20,
         limit: int = 1000,
+        page_token: Optional[str] = None,
         feed: Optional[str] = None,
         currency: Optional[str] = None,
         sort: str = "asc",
@@ -242,6 +282,10 @@ def register_market_data_tools(
             minutes: Additional minutes in the lookback (default 20).
             limit: Max total data points returned across all symbols,
                    1–10000 (default 1000).
+            page_token: next_page_token from a previous response, to fetch
+                        the following page instead of raising limit. Pass
+                        an explicit start when paging; a relative lookback
+                        moves with the clock between calls.
             feed: Data feed — "sip" (all US exchanges, default, paid),
                   "iex" (free tier), "otc", or "boats".
                   Paper/free accounts must set feed="iex" to avoid 403 errors.
@@ -249,13 +293,12 @@ def register_market_data_tools(
             sort: Timestamp sort order — "asc" (default) or "desc".
             asof: As-of date (YYYY-MM-DD) for point-in-time symbol mapping.
         """
-        if start is None:
-            start = _relative_start(days=days, hours=hours, minutes=minutes)
         return await _get(client, "/v2/stocks/trades", {
             "symbols": symbols,
-            "start": start,
+            "start": _resolve_start(start, days, hours, minutes),
             "end": end,
             "limit": limit,
+            "page_token": page_token,
             "feed": feed,
             "currency": currency,
             "sort": sort,
@@ -280,6 +323,7 @@ def register_market_data_tools(
         hours: int = 0,
         minutes: int = 0,
         limit: int = 1000,
+        page_token: Optional[str] = None,
         sort: str = "asc",
     ) -> dict:
         """Retrieve historical price bars (OHLCV) for one or more cryptocurrencies.
@@ -299,16 +343,19 @@ def register_market_data_tools(
             minutes: Additional minutes in the lookback (default 0).
             limit: Max total data points returned across all symbols,
                    1–10000 (default 1000).
+            page_token: next_page_token from a previous response, to fetch
+                        the following page instead of raising limit. Pass
+                        an explicit start when paging; a relative lookback
+                        moves with the clock between calls.
             sort: Timestamp sort order — "asc" (default) or "desc".
         """
-        if start is None:
-            start = _relative_start(days=days, hours=hours, minutes=minutes)
         return await _get(client, "/v1beta3/crypto/us/bars", {
             "symbols": symbols,
             "timeframe": _normalize_timeframe(timeframe),
-            "start": start,
+            "start": _resolve_start(start, days, hours, minutes),
             "end": end,
             "limit": limit,
+            "page_token": page_token,
             "sort": sort,
         })
 
@@ -327,6 +374,7 @@ def register_market_data_tools(
         hours: int = 0,
         minutes: int = 15,
         limit: int = 1000,
+        page_token: Optional[str] = None,
         sort: str = "asc",
     ) -> dict:
         """Retrieve historical bid/ask quotes for one or more cryptocurrencies.
@@ -344,15 +392,18 @@ def register_market_data_tools(
             minutes: Additional minutes in the lookback (default 15).
             limit: Max total data points returned across all symbols,
                    1–10000 (default 1000).
+            page_token: next_page_token from a previous response, to fetch
+                        the following page instead of raising limit. Pass
+                        an explicit start when paging; a relative lookback
+                        moves with the clock between calls.
             sort: Timestamp sort order — "asc" (default) or "desc".
         """
-        if start is None:
-            start = _relative_start(days=days, hours=hours, minutes=minutes)
         return await _get(client, "/v1beta3/crypto/us/quotes", {
             "symbols": symbols,
-            "start": start,
+            "start": _resolve_start(start, days, hours, minutes),
             "end": end,
             "limit": limit,
+            "page_token": page_token,
             "sort": sort,
         })
 
@@ -371,6 +422,7 @@ def register_market_data_tools(
         hours: int = 0,
         minutes: int = 15,
         limit: int = 1000,
+        page_token: Optional[str] = None,
         sort: str = "asc",
     ) -> dict:
         """Retrieve historical trade data for one or more cryptocurrencies.
@@ -388,14 +440,17 @@ def register_market_data_tools(
             minutes: Additional minutes in the lookback (default 15).
             limit: Max total data points returned across all symbols,
                    1–10000 (default 1000).
+            page_token: next_page_token from a previous response, to fetch
+                        the following page instead of raising limit. Pass
+                        an explicit start when paging; a relative lookback
+                        moves with the clock between calls.
             sort: Timestamp sort order — "asc" (default) or "desc".
         """
-        if start is None:
-            start = _relative_start(days=days, hours=hours, minutes=minutes)
         return await _get(client, "/v1beta3/crypto/us/trades", {
             "symbols": symbols,
-            "start": start,
+            "start": _resolve_start(start, days, hours, minutes),
             "end": end,
             "limit": limit,
+            "page_token": page_token,
             "sort": sort,
         })
@@ -0,0 +1,166 @@
+"""
+Client-side concurrency and rate limiting for outbound Alpaca API requests.
+
+Alpaca enforces a per-account request budget and answers with HTTP 429 once
+it is spent. Agents fan tool calls out concurrently, so every httpx client is
+given a transport that caps the number of in-flight requests and, when the
+``X-RateLimit-*`` response headers report the budget is nearly exhausted,
+holds further requests until the window resets instead of burning retries on
+429s. Idempotent requests that hit a transient 429/5xx are retried with a
+short backoff; order placement and other writes never are.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import urllib.request
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 32
+
+# Start holding requests once this many remain in the current window.
+DEFAULT_REMAINING_THRESHOLD = 1
+
+# Never stall a request longer than one rate-limit window, even if the
+# reset header is skewed or malformed.
+MAX_RESET_WAIT_SECONDS = 60.0
+
+# Connection attempts that fail before a request is sent are always safe
+# to repeat; httpx retries these itself.
+CONNECT_RETRIES = 2
+
+DEFAULT_MAX_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 0.2
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _max_concurrency_from_env() -> int:
+    raw = os.environ.get("ALPACA_MAX_CONCURRENCY", "").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return DEFAULT_MAX_CONCURRENCY
+    return value if value > 0 else DEFAULT_MAX_CONCURRENCY
+
+
+def _env_proxies() -> dict[str, str]:
+    """Proxy URL per scheme from HTTP(S)_PROXY / ALL_PROXY, as httpx reads them.
+
+    httpx only honours these variables when a client builds its own
+    transport, so the default transport has to apply them itself.
+    """
+    proxies = urllib.request.getproxies()
+    resolved: dict[str, str] = {}
+    for scheme in ("http", "https"):
+        url = proxies.get(scheme) or proxies.get("all")
+        if url:
+            resolved[scheme] = url if "://" in url else f"http://{url}"
+    return resolved
+
+
+def _int_header(headers: httpx.Headers, name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Wraps an httpx transport with a concurrency cap and header-driven pacing."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_concurrency: int | None = None,
+        remaining_threshold: int = DEFAULT_REMAINING_THRESHOLD,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.max_concurrency = (
+            max_concurrency if max_concurrency is not None else _max_concurrency_from_env()
+        )
+        self._proxy_transports: dict[str, httpx.AsyncBaseTransport] = {}
+        if transport is None:
+            transport = self._http_transport()
+            self._proxy_transports = {
+                scheme: self._http_transport(proxy=url)
+                for scheme, url in _env_proxies().items()
+            }
+        self._transport = transport
+        self.remaining_threshold = remaining_threshold
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._clock = clock
+        self._sleep = sleep
+        # Wall-clock time (epoch seconds, as sent in X-RateLimit-Reset)
+        # before which no new request should be sent.
+        self._resume_at = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retries = self.max_retries if request.method in IDEMPOTENT_METHODS else 0
+        backoff = 0.0
+        async with self._semaphore:
+            for attempt in range(retries + 1):
+                await self._wait_for_budget(backoff)
+                response = await self._route(request).handle_async_request(request)
+                self._observe(response)
+                if attempt == retries or response.status_code not in RETRY_STATUSES:
+                    break
+                await response.aclose()
+                logger.debug(
+                    "retrying %s %s after HTTP %d",
+                    request.method,
+                    request.url,
+                    response.status_code,
+                )
+                backoff = RETRY_BACKOFF_SECONDS * 2**attempt
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+        for transport in self._proxy_transports.values():
+            await transport.aclose()
+
+    def _http_transport(self, proxy: str | None = None) -> httpx.AsyncHTTPTransport:
+        # Keep one warm keep-alive connection per concurrent request so
+        # back-to-back tool calls skip the TCP + TLS handshake.
+        return httpx.AsyncHTTPTransport(
+            retries=CONNECT_RETRIES,
+            proxy=proxy,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+
+    def _route(self, request: httpx.Request) -> httpx.AsyncBaseTransport:
+        proxied = self._proxy_transports.get(request.url.scheme)
+        if proxied is None or urllib.request.proxy_bypass(request.url.host):
+            return self._transport
+        return proxied
+
+    async def _wait_for_budget(self, minimum: float = 0.0) -> None:
+        delay = max(minimum, min(self._resume_at - self._clock(), MAX_RESET_WAIT_SECONDS))
+        if delay > 0:
+            logger.debug("rate limit nearly exhausted; waiting %.2fs", delay)
+            await self._sleep(delay)
+
+    def _observe(self, response: httpx.Response) -> None:
+        reset = _int_header(response.headers, "X-RateLimit-Reset")
+        if reset is None:
+            return
+        remaining = _int_header(response.headers, "X-RateLimit-Remaining")
+        exhausted = response.status_code == 429 or (
+            remaining is not None and remaining <= self.remaining_threshold
+        )
+        if exhausted:
+            self._resume_at = max(self._resume_at, float(reset))
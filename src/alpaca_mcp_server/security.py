@@ -53,10 +53,7 @@ def _extract_payload(result: ToolResult) -> Any:
     if result.structured_content is not None:
         return result.structured_content
 
-    texts = []
-    for block in result.content:
-        if hasattr(block, "text"):
-            texts.append(block.text)
+    texts = [block.text for block in result.content if hasattr(block, "text")]
     if texts:
         return {"text": "\n".join(texts)}
 
@@ -18,6 +18,9 @@ import httpx
 from fastmcp import FastMCP
 from fastmcp.server.providers.openapi.routing import MCPType
 
+from .batching import SymbolCoalescingMiddleware
+from .caching import ResponseCacheMiddleware
+from .ratelimit import RateLimitedTransport
 from .security import TrustBoundaryMiddleware
 from .tool_registry import TOOL_DESCRIPTIONS, TOOL_NAMES
 from .toolsets import OVERRIDE_OPERATION_IDS, TOOLSETS, get_active_operations
@@ -112,6 +115,7 @@ def build_server() -> FastMCP:
             base_url=trading_base,
             headers=auth_headers,
             timeout=30.0,
+            transport=RateLimitedTransport(),
         )
         clients.append(trading_client)
 
@@ -121,6 +125,7 @@ def build_server() -> FastMCP:
             base_url=data_base,
             headers=auth_headers,
             timeout=30.0,
+            transport=RateLimitedTransport(),
         )
         clients.append(data_client)
 
@@ -134,6 +139,8 @@ def build_server() -> FastMCP:
 
     main = FastMCP("Alpaca MCP Server", lifespan=lifespan)
     main.add_middleware(TrustBoundaryMiddleware())
+    main.add_middleware(ResponseCacheMiddleware())
+    main.add_middleware(SymbolCoalescingMiddleware())
 
     if trading_client is not None:
         allowed = spec_ops["trading"]
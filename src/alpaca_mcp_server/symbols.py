@@ -0,0 +1,13 @@
+"""
+Helpers for the comma-separated ``symbols`` argument taken by market data tools.
+"""
+
+from __future__ import annotations
+
+
+def split_symbols(value: str) -> list[str]:
+    """Split a comma-separated symbols string, dropping blanks and repeats.
+
+    Order is preserved; the first occurrence of a repeated symbol wins.
+    """
+    return list(dict.fromkeys(s for s in (part.strip() for part in value.split(",")) if s))
@@ -10,6 +10,12 @@ Each key is the operationId from the OpenAPI spec. Values contain:
   - description: curated description shown to LLMs
   - output_risk: classification of how much untrusted external text the
                  tool output may contain (see OutputRisk)
+  - cache_ttl:   seconds a successful response may be served from the
+                 in-process response cache (None disables caching)
+  - cache_closed_window_only: only cache calls whose ``end`` is safely in
+                 the past, so the live tail of a time series is never stale
+  - coalesce_key: response field holding the per-symbol mapping; when set,
+                 concurrent single-symbol calls are merged into one request
 """
 
 from dataclasses import dataclass
@@ -23,6 +29,9 @@ class ToolDefinition:
     name: str
     description: str
     output_risk: OutputRisk = "api_structured"
+    cache_ttl: float | None = None
+    cache_closed_window_only: bool = False
+    coalesce_key: str | None = None
 
 
 TOOLS: dict[str, ToolDefinition] = {
@@ -184,7 +193,12 @@ TOOLS: dict[str, ToolDefinition] = {
     ),
     "get-options-contracts": ToolDefinition(
         name="get_option_contracts",
-        description="Retrieves option contracts for underlying symbol(s).",
+        description=(
+            "Retrieves option contracts for underlying symbol(s). "
+            "Results are paginated (100 contracts per page by default); "
+            "pass the response's next_page_token as page_token to fetch the next page."
+        ),
+        cache_ttl=60.0,
     ),
     "get-option-contract-symbol_or_id": ToolDefinition(
         name="get_option_contract",
@@ -198,10 +212,12 @@ TOOLS: dict[str, ToolDefinition] = {
             "Without date bounds the response contains the entire multi-year "
             "calendar and will be extremely large."
         ),
+        cache_ttl=3600.0,
     ),
     "LegacyClock": ToolDefinition(
         name="get_clock",
         description="Retrieves and formats current market status and next open/close times.",
+        cache_ttl=5.0,
     ),
     "get-v2-corporate_actions-announcements": ToolDefinition(
         name="get_corporate_action_announcements",
@@ -223,6 +239,8 @@ TOOLS: dict[str, ToolDefinition] = {
             "Retrieves and formats historical price bars for stocks "
             "with configurable timeframe and time range."
         ),
+        cache_ttl=60.0,
+        cache_closed_window_only=True,
     ),
     "StockQuotes": ToolDefinition(
         name="get_stock_quotes",
@@ -235,14 +253,18 @@ TOOLS: dict[str, ToolDefinition] = {
     "StockLatestBars": ToolDefinition(
         name="get_stock_latest_bar",
         description="Get the latest minute bar for one or more stocks.",
+        coalesce_key="bars",
     ),
     "StockLatestQuotes": ToolDefinition(
         name="get_stock_latest_quote",
         description="Retrieves and formats the latest quote for one or more stocks.",
+        cache_ttl=1.5,
+        coalesce_key="quotes",
     ),
     "StockLatestTrades": ToolDefinition(
         name="get_stock_latest_trade",
         description="Get the latest trade for one or more stocks.",
+        coalesce_key="trades",
     ),
     "StockSnapshots": ToolDefinition(
         name="get_stock_snapshot",
@@ -250,6 +272,7 @@ TOOLS: dict[str, ToolDefinition] = {
             "Retrieves comprehensive snapshots of stock symbols including latest trade, "
             "quote, minute bar, daily bar, and previous daily bar."
         ),
+        cache_ttl=15.0,
     ),
     "MostActives": ToolDefinition(
         name="get_most_active_stocks",
@@ -267,14 +290,20 @@ TOOLS: dict[str, ToolDefinition] = {
             "Retrieves and formats historical price bars for cryptocurrencies "
             "with configurable timeframe and time range."
         ),
+        cache_ttl=60.0,
+        cache_closed_window_only=True,
     ),
     "CryptoQuotes": ToolDefinition(
         name="get_crypto_quotes",
         description="Returns historical quote data for one or more crypto symbols.",
+        cache_ttl=60.0,
+        cache_closed_window_only=True,
     ),
     "CryptoTrades": ToolDefinition(
         name="get_crypto_trades",
         description="Returns historical trade data for one or more crypto symbols.",
+        cache_ttl=60.0,
+        cache_closed_window_only=True,
     ),
     "CryptoLatestBars": ToolDefinition(
         name="get_crypto_latest_bar",
@@ -282,6 +311,8 @@ TOOLS: dict[str, ToolDefinition] = {
             "Returns the latest minute bar for one or more crypto symbols. "
             "The loc parameter is required — always set loc to \"us\"."
         ),
+        cache_ttl=1.5,
+        coalesce_key="bars",
     ),
     "CryptoLatestQuotes": ToolDefinition(
         name="get_crypto_latest_quote",
@@ -289,6 +320,8 @@ TOOLS: dict[str, ToolDefinition] = {
             "Returns the latest quote for one or more crypto symbols. "
             "The loc parameter is required — always set loc to \"us\"."
         ),
+        cache_ttl=1.5,
+        coalesce_key="quotes",
     ),
     "CryptoLatestTrades": ToolDefinition(
         name="get_crypto_latest_trade",
@@ -296,6 +329,8 @@ TOOLS: dict[str, ToolDefinition] = {
             "Returns the latest trade for one or more crypto symbols. "
             "The loc parameter is required — always set loc to \"us\"."
         ),
+        cache_ttl=1.5,
+        coalesce_key="trades",
     ),
     "CryptoSnapshots": ToolDefinition(
         name="get_crypto_snapshot",
@@ -304,6 +339,8 @@ TOOLS: dict[str, ToolDefinition] = {
             "quote, minute bar, daily bar, and previous daily bar. "
             "The loc parameter is required — always set loc to \"us\"."
         ),
+        cache_ttl=5.0,
+        coalesce_key="snapshots",
     ),
     "CryptoLatestOrderbooks": ToolDefinition(
         name="get_crypto_latest_orderbook",
@@ -312,6 +349,8 @@ TOOLS: dict[str, ToolDefinition] = {
             "The loc parameter is required — always set loc to \"us\". "
             "Note: the response includes the full order book depth and can be large."
         ),
+        cache_ttl=1.0,
+        coalesce_key="orderbooks",
     ),
 
     # --- Options Data ---
@@ -326,6 +365,7 @@ TOOLS: dict[str, ToolDefinition] = {
     "OptionLatestTrades": ToolDefinition(
         name="get_option_latest_trade",
         description="Retrieves the latest trade for one or more option contracts.",
+        coalesce_key="trades",
     ),
     "OptionLatestQuotes": ToolDefinition(
         name="get_option_latest_quote",
@@ -333,6 +373,7 @@ TOOLS: dict[str, ToolDefinition] = {
             "Retrieves and formats the latest quote for one or more option contracts "
             "including bid/ask prices, sizes, and exchange information."
         ),
+        coalesce_key="quotes",
     ),
     "OptionSnapshots": ToolDefinition(
         name="get_option_snapshot",
@@ -432,9 +473,10 @@ TOOLS: dict[str, ToolDefinition] = {
 
 }
 
-# Derived lookups used by server.py and security.py
+# Derived lookups used by server.py, security.py, caching.py, and batching.py
 TOOL_NAMES: dict[str, str] = {op_id: t.name for op_id, t in TOOLS.items()}
 TOOL_DESCRIPTIONS: dict[str, str] = {op_id: t.description for op_id, t in TOOLS.items()}
 TOOL_OUTPUT_RISK_BY_NAME: dict[str, OutputRisk] = {
     t.name: t.output_risk for t in TOOLS.values()
 }
+TOOLS_BY_NAME: dict[str, ToolDefinition] = {t.name: t for t in TOOLS.values()}
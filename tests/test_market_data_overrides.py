@@ -0,0 +1,118 @@
+"""
+Tests for the historical market data override helpers.
+
+Covers:
+- Timeframe spelling normalization
+- Blank symbols are rejected without an HTTP request
+- Repeated symbols are requested once
+- page_token is forwarded to the API
+- An explicit start wins over the lookback; no lookback sends no start
+- SIP subscription 403s carry a remediation hint
+"""
+
+from __future__ import annotations
+
+import httpx
+from fastmcp import FastMCP
+from fastmcp.client import Client
+
+from alpaca_mcp_server.market_data_overrides import (
+    _get,
+    _normalize_timeframe,
+    register_market_data_tools,
+)
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url="https://data.test", transport=httpx.MockTransport(handler))
+
+
+async def _call_and_capture(tool: str, arguments: dict) -> httpx.Request:
+    """Call a registered override tool and return the request it sent."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"bars": {}, "next_page_token": None})
+
+    server = FastMCP("test")
+    async with _client(handler) as http:
+        register_market_data_tools(server, http)
+        async with Client(transport=server) as client:
+            await client.call_tool(tool, arguments)
+
+    (request,) = requests
+    return request
+
+
+def test_normalize_timeframe_variants():
+    assert _normalize_timeframe("1day") == "1Day"
+    assert _normalize_timeframe(" 2HOUR ") == "2Hour"
+    assert _normalize_timeframe("15Min") == "15Min"
+    assert _normalize_timeframe("fortnight") == "fortnight"
+
+
+async def test_blank_symbols_skip_the_request():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={})
+
+    async with _client(handler) as client:
+        result = await _get(client, "/v2/stocks/bars", {"symbols": " , "})
+
+    assert requests == []
+    assert "error" in result
+
+
+async def test_repeated_symbols_are_requested_once():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"bars": {}})
+
+    async with _client(handler) as client:
+        await _get(client, "/v1beta3/crypto/us/bars", {"symbols": "BTC/USD, ETH/USD,BTC/USD"})
+
+    assert requests[0].url.params["symbols"] == "BTC/USD,ETH/USD"
+
+
+async def test_sip_forbidden_includes_hint():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            403, json={"message": "subscription does not permit querying recent SIP data"}
+        )
+
+    async with _client(handler) as client:
+        result = await _get(client, "/v2/stocks/bars", {"symbols": "AAPL"})
+
+    assert result["error"]["http_status"] == 403
+    assert "feed=\"iex\"" in result["error"]["hint"]
+
+
+async def test_page_token_is_forwarded():
+    request = await _call_and_capture(
+        "get_stock_bars",
+        {"symbols": "AAPL", "start": "2024-01-02T00:00:00Z", "page_token": "abc"},
+    )
+
+    assert request.url.params["page_token"] == "abc"
+
+
+async def test_explicit_start_overrides_lookback():
+    request = await _call_and_capture(
+        "get_crypto_bars",
+        {"symbols": "BTC/USD", "start": "2024-01-02T00:00:00Z", "days": 3},
+    )
+
+    assert request.url.params["start"] == "2024-01-02T00:00:00Z"
+
+
+async def test_zero_lookback_sends_no_start():
+    request = await _call_and_capture(
+        "get_stock_bars", {"symbols": "AAPL", "days": 0, "hours": 0, "minutes": 0}
+    )
+
+    assert "start" not in request.url.params
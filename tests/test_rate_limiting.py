@@ -0,0 +1,133 @@
+"""
+Tests for the RateLimitedTransport outbound request limiter.
+
+Covers:
+- In-flight requests never exceed max_concurrency
+- A nearly exhausted X-RateLimit budget holds the next request until reset
+- A 429 with a reset header is retried once the window resets
+- Idempotent requests are retried on transient 5xx; writes are not
+- Responses without rate-limit headers never cause a wait
+- The default transport honours HTTPS_PROXY from the environment
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from alpaca_mcp_server.ratelimit import RateLimitedTransport
+
+
+class _FakeTime:
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _client(handler, **kwargs) -> httpx.AsyncClient:
+    transport = RateLimitedTransport(httpx.MockTransport(handler), **kwargs)
+    return httpx.AsyncClient(base_url="https://example.test", transport=transport)
+
+
+async def test_concurrency_is_capped():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={})
+
+    async with _client(handler, max_concurrency=2) as client:
+        await asyncio.gather(*(client.get("/v2/clock") for _ in range(6)))
+
+    assert peak == 2
+
+
+async def test_low_remaining_budget_waits_for_reset():
+    clock = _FakeTime()
+    responses = iter([
+        httpx.Response(200, headers={"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "1005"}),
+        httpx.Response(200, headers={"X-RateLimit-Remaining": "199", "X-RateLimit-Reset": "1065"}),
+    ])
+
+    async with _client(lambda r: next(responses), clock=clock, sleep=clock.sleep) as client:
+        await client.get("/v2/account")
+        await client.get("/v2/account")
+
+    assert clock.sleeps == [5.0]
+
+
+async def test_too_many_requests_is_retried_after_reset():
+    clock = _FakeTime()
+    responses = iter([
+        httpx.Response(429, headers={"X-RateLimit-Reset": "1002"}),
+        httpx.Response(200),
+    ])
+
+    async with _client(lambda r: next(responses), clock=clock, sleep=clock.sleep) as client:
+        response = await client.get("/v2/account")
+
+    assert response.status_code == 200
+    assert clock.sleeps == [2.0]
+
+
+async def test_transient_errors_retry_reads_but_not_writes():
+    clock = _FakeTime()
+    methods: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        methods.append(request.method)
+        return httpx.Response(503)
+
+    async with _client(handler, clock=clock, sleep=clock.sleep) as client:
+        read = await client.get("/v2/positions")
+        write = await client.post("/v2/orders", json={"symbol": "AAPL"})
+
+    assert read.status_code == 503
+    assert write.status_code == 503
+    assert methods == ["GET", "GET", "GET", "POST"]
+
+
+async def test_missing_headers_never_wait():
+    clock = _FakeTime()
+
+    async with _client(lambda r: httpx.Response(200), clock=clock, sleep=clock.sleep) as client:
+        for _ in range(3):
+            await client.get("/v2/account")
+
+    assert clock.sleeps == []
+
+
+async def test_default_transport_uses_env_proxy(monkeypatch):
+    request_lines: list[bytes] = []
+
+    async def proxy(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        request_lines.append(await reader.readline())
+        writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(proxy, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    for name in ("NO_PROXY", "no_proxy", "ALL_PROXY", "all_proxy", "https_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTPS_PROXY", f"http://127.0.0.1:{port}")
+
+    async with server, httpx.AsyncClient(transport=RateLimitedTransport()) as client:
+        with pytest.raises(httpx.ProxyError):
+            await client.get("https://paper-api.alpaca.markets/v2/clock")
+
+    assert request_lines == [b"CONNECT paper-api.alpaca.markets:443 HTTP/1.1\r\n"]
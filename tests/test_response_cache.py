@@ -0,0 +1,196 @@
+"""
+Tests for the ResponseCacheMiddleware TTL cache.
+
+Covers:
+- Tools with a cache_ttl are served from cache on repeat calls
+- Symbol order does not affect the cache key
+- Tools without a cache_ttl always reach the upstream handler
+- Error payloads are never cached
+- Time-series tools only cache closed windows
+- Large payloads are stored compressed and restored intact
+- TTLCache expiry, LRU eviction and byte budget
+"""
+
+from __future__ import annotations
+
+import pytest
+from fastmcp import FastMCP
+from fastmcp.client import Client
+
+from alpaca_mcp_server.caching import (
+    ResponseCacheMiddleware,
+    TTLCache,
+    _CompressedResult,
+    _parse_timestamp,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _counting_server(
+    tool_name: str,
+    payload: dict | None = None,
+    cache: TTLCache | None = None,
+) -> tuple[FastMCP, list]:
+    """Server exposing a single tool under ``tool_name`` that records its calls."""
+    server = FastMCP("test")
+    server.add_middleware(ResponseCacheMiddleware(cache))
+    calls: list[dict] = []
+
+    async def handler(
+        symbols: str = "AAPL",
+        start: str | None = None,
+        end: str | None = None,
+    ) -> dict:
+        calls.append({"symbols": symbols, "end": end})
+        return payload if payload is not None else {"n": len(calls)}
+
+    server.tool(name=tool_name)(handler)
+    return server, calls
+
+
+async def test_repeat_call_is_served_from_cache():
+    server, calls = _counting_server("get_stock_latest_quote")
+    async with Client(transport=server) as client:
+        first = await client.call_tool("get_stock_latest_quote", {"symbols": "AAPL"})
+        second = await client.call_tool("get_stock_latest_quote", {"symbols": "AAPL"})
+
+    assert len(calls) == 1
+    assert first.structured_content == second.structured_content
+
+
+async def test_symbol_order_shares_cache_entry():
+    server, calls = _counting_server("get_stock_snapshot")
+    async with Client(transport=server) as client:
+        await client.call_tool("get_stock_snapshot", {"symbols": "AAPL,MSFT"})
+        await client.call_tool("get_stock_snapshot", {"symbols": "MSFT, AAPL"})
+
+    assert len(calls) == 1
+
+
+async def test_uncached_tool_always_calls_through():
+    server, calls = _counting_server("get_account_info")
+    async with Client(transport=server) as client:
+        await client.call_tool("get_account_info", {})
+        await client.call_tool("get_account_info", {})
+
+    assert len(calls) == 2
+
+
+async def test_error_payload_is_not_cached():
+    server, calls = _counting_server(
+        "get_stock_latest_quote", payload={"error": {"message": "boom"}}
+    )
+    async with Client(transport=server) as client:
+        await client.call_tool("get_stock_latest_quote", {"symbols": "AAPL"})
+        await client.call_tool("get_stock_latest_quote", {"symbols": "AAPL"})
+
+    assert len(calls) == 2
+
+
+async def test_open_window_bars_are_not_cached():
+    server, calls = _counting_server("get_stock_bars")
+    async with Client(transport=server) as client:
+        await client.call_tool("get_stock_bars", {"symbols": "AAPL"})
+        await client.call_tool("get_stock_bars", {"symbols": "AAPL"})
+
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize(
+    "tool_name", ["get_stock_bars", "get_crypto_bars", "get_crypto_quotes", "get_crypto_trades"]
+)
+async def test_closed_window_history_is_cached(tool_name):
+    server, calls = _counting_server(tool_name)
+    args = {"symbols": "AAPL", "start": "2024-01-02", "end": "2024-01-31T00:00:00Z"}
+    async with Client(transport=server) as client:
+        await client.call_tool(tool_name, args)
+        await client.call_tool(tool_name, args)
+
+    assert len(calls) == 1
+
+
+async def test_large_payload_is_compressed_in_cache():
+    bars = [{"t": f"2024-01-02T15:{i % 60:02d}:00Z", "o": 1.5, "c": 2.5} for i in range(500)]
+    payload = {"bars": {"AAPL": bars}, "next_page_token": None}
+    cache = TTLCache()
+    server, calls = _counting_server("get_stock_snapshot", payload=payload, cache=cache)
+    async with Client(transport=server) as client:
+        await client.call_tool("get_stock_snapshot", {"symbols": "AAPL"})
+        second = await client.call_tool("get_stock_snapshot", {"symbols": "AAPL"})
+
+    assert len(calls) == 1
+    assert second.structured_content == payload
+    (entry,) = (value for _, value, _ in cache._entries.values())
+    assert 0 < cache.nbytes < 4096
+    assert isinstance(entry, _CompressedResult)
+
+
+def test_parse_timestamp_accepts_rfc3339_variants():
+    assert _parse_timestamp("2024-01-02").isoformat() == "2024-01-02T00:00:00+00:00"
+    assert _parse_timestamp("2024-01-02T15:04:05Z").hour == 15
+    nanos = _parse_timestamp("2024-01-02T15:04:05.123456789Z")
+    assert nanos.microsecond == 123456
+    assert _parse_timestamp("last tuesday") is None
+
+
+def test_ttl_cache_expires_entries():
+    clock = _FakeClock()
+    cache = TTLCache(clock=clock)
+    cache.set("k", "v", ttl=1.5)
+    assert cache.get("k") == "v"
+    clock.now = 1.5
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_set_drops_expired_entries():
+    clock = _FakeClock()
+    cache = TTLCache(clock=clock)
+    cache.set("calendar", 0, ttl=3600, size=10)
+    for i in range(3):
+        cache.set(f"quote{i}", i, ttl=1.5, size=10)
+    clock.now = 10
+    cache.set("c", 3, ttl=60, size=10)
+    assert len(cache) == 2
+    assert cache.nbytes == 20
+
+
+def test_ttl_cache_reset_entry_keeps_new_expiry():
+    clock = _FakeClock()
+    cache = TTLCache(clock=clock)
+    cache.set("k", "old", ttl=1)
+    clock.now = 0.5
+    cache.set("k", "new", ttl=60)
+    clock.now = 2
+    cache.set("other", 1, ttl=60)
+    assert cache.get("k") == "new"
+
+
+def test_ttl_cache_evicts_to_byte_budget():
+    cache = TTLCache(max_bytes=100)
+    cache.set("a", 1, ttl=60, size=40)
+    cache.set("b", 2, ttl=60, size=40)
+    cache.set("c", 3, ttl=60, size=40)
+    assert cache.get("a") is None
+    assert cache.nbytes == 80
+    cache.set("huge", 4, ttl=60, size=101)
+    assert cache.get("huge") is None
+    assert len(cache) == 2
@@ -0,0 +1,191 @@
+"""
+Tests for the SymbolCoalescingMiddleware request coalescer.
+
+Covers:
+- Concurrent single-symbol calls are merged into one upstream request
+- Each caller only receives its own symbol from the merged response
+- Calls with differing non-symbol arguments are not merged
+- Multi-symbol calls and tools without a coalesce_key pass straight through
+- Calls naming more than max_batch symbols are split and merged back
+- A rejected symbol only fails the caller that sent it
+- Other upstream failures reach every caller without per-symbol retries
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+from fastmcp import FastMCP
+from fastmcp.client import Client
+from fastmcp.exceptions import ToolError
+
+from alpaca_mcp_server.batching import SymbolCoalescingMiddleware
+
+
+def _quote_server(status: int = 400) -> tuple[FastMCP, list[str]]:
+    """Server with a fake get_stock_latest_quote that records upstream requests.
+
+    Requests naming a non-alphanumeric symbol fail with HTTP ``status``.
+    """
+    server = FastMCP("test")
+    server.add_middleware(SymbolCoalescingMiddleware())
+    requests: list[str] = []
+
+    @server.tool()
+    async def get_stock_latest_quote(symbols: str, feed: str = "iex") -> dict:
+        requests.append(symbols)
+        invalid = [s for s in symbols.split(",") if not s.isalnum()]
+        if invalid:
+            request = httpx.Request("GET", "https://data.test/v2/stocks/quotes/latest")
+            raise httpx.HTTPStatusError(
+                f"invalid symbol: {invalid[0]}",
+                request=request,
+                response=httpx.Response(status, request=request),
+            )
+        return {
+            "quotes": {s: {"ap": float(i), "feed": feed} for i, s in enumerate(symbols.split(","))},
+            "currency": "USD",
+        }
+
+    @server.tool()
+    async def get_account_info(symbols: str = "") -> dict:
+        requests.append("account")
+        return {"ok": True}
+
+    return server, requests
+
+
+async def test_concurrent_single_symbol_calls_are_merged():
+    server, requests = _quote_server()
+    async with Client(transport=server) as client:
+        results = await asyncio.gather(
+            *(
+                client.call_tool("get_stock_latest_quote", {"symbols": s})
+                for s in ("AAPL", "MSFT", "GOOG")
+            )
+        )
+
+    assert len(requests) == 1
+    assert set(requests[0].split(",")) == {"AAPL", "MSFT", "GOOG"}
+    for symbol, result in zip(("AAPL", "MSFT", "GOOG"), results):
+        content = result.structured_content
+        assert list(content["quotes"]) == [symbol]
+        assert content["currency"] == "USD"
+
+
+async def test_crypto_pairs_are_merged_per_location():
+    server = FastMCP("test")
+    server.add_middleware(SymbolCoalescingMiddleware())
+    requests: list[tuple[str, str]] = []
+
+    @server.tool()
+    async def get_crypto_snapshot(loc: str, symbols: str) -> dict:
+        requests.append((loc, symbols))
+        return {"snapshots": {s: {"loc": loc} for s in symbols.split(",")}}
+
+    async with Client(transport=server) as client:
+        btc, eth, eu = await asyncio.gather(
+            client.call_tool("get_crypto_snapshot", {"loc": "us", "symbols": "BTC/USD"}),
+            client.call_tool("get_crypto_snapshot", {"loc": "us", "symbols": "ETH/USD"}),
+            client.call_tool("get_crypto_snapshot", {"loc": "eu-1", "symbols": "BTC/USD"}),
+        )
+
+    assert sorted(loc for loc, _ in requests) == ["eu-1", "us"]
+    assert ("eu-1", "BTC/USD") in requests
+    assert btc.structured_content == {"snapshots": {"BTC/USD": {"loc": "us"}}}
+    assert eth.structured_content == {"snapshots": {"ETH/USD": {"loc": "us"}}}
+    assert eu.structured_content == {"snapshots": {"BTC/USD": {"loc": "eu-1"}}}
+
+
+async def test_differing_arguments_are_not_merged():
+    server, requests = _quote_server()
+    async with Client(transport=server) as client:
+        await asyncio.gather(
+            client.call_tool("get_stock_latest_quote", {"symbols": "AAPL", "feed": "iex"}),
+            client.call_tool("get_stock_latest_quote", {"symbols": "MSFT", "feed": "sip"}),
+        )
+
+    assert sorted(requests) == ["AAPL", "MSFT"]
+
+
+async def test_multi_symbol_and_unregistered_calls_pass_through():
+    server, requests = _quote_server()
+    async with Client(transport=server) as client:
+        result = await client.call_tool("get_stock_latest_quote", {"symbols": "AAPL,MSFT"})
+        await client.call_tool("get_account_info", {"symbols": "AAPL"})
+
+    assert requests == ["AAPL,MSFT", "account"]
+    assert set(result.structured_content["quotes"]) == {"AAPL", "MSFT"}
+
+
+async def test_upstream_error_only_reaches_offending_caller():
+    server, requests = _quote_server()
+    async with Client(transport=server) as client:
+        good, bad = await asyncio.gather(
+            client.call_tool("get_stock_latest_quote", {"symbols": "AAPL"}),
+            client.call_tool("get_stock_latest_quote", {"symbols": "BAD!"}),
+            return_exceptions=True,
+        )
+
+    assert requests[0] == "AAPL,BAD!"
+    assert sorted(requests[1:]) == ["AAPL", "BAD!"]
+    assert isinstance(bad, ToolError)
+    assert "BAD!" in str(bad)
+    assert list(good.structured_content["quotes"]) == ["AAPL"]
+
+
+async def test_server_error_is_not_retried_per_symbol():
+    server, requests = _quote_server(status=503)
+    async with Client(transport=server) as client:
+        results = await asyncio.gather(
+            client.call_tool("get_stock_latest_quote", {"symbols": "AAPL"}),
+            client.call_tool("get_stock_latest_quote", {"symbols": "BAD!"}),
+            return_exceptions=True,
+        )
+
+    assert requests == ["AAPL,BAD!"]
+    assert all(isinstance(r, ToolError) for r in results)
+
+
+async def test_max_batch_flushes_immediately():
+    server = FastMCP("test")
+    server.add_middleware(SymbolCoalescingMiddleware(window=60.0, max_batch=2))
+    requests: list[str] = []
+
+    @server.tool()
+    async def get_stock_latest_quote(symbols: str) -> dict:
+        requests.append(symbols)
+        return {"quotes": {s: {} for s in symbols.split(",")}}
+
+    async with Client(transport=server) as client:
+        await asyncio.wait_for(
+            asyncio.gather(
+                client.call_tool("get_stock_latest_quote", {"symbols": "AAPL"}),
+                client.call_tool("get_stock_latest_quote", {"symbols": "MSFT"}),
+            ),
+            timeout=5,
+        )
+
+    assert len(requests) == 1
+
+
+async def test_oversized_symbol_list_is_chunked_and_merged():
+    server = FastMCP("test")
+    server.add_middleware(SymbolCoalescingMiddleware(max_batch=2))
+    requests: list[str] = []
+
+    @server.tool()
+    async def get_stock_latest_quote(symbols: str) -> dict:
+        requests.append(symbols)
+        return {"quotes": {s: {"ap": 1.0} for s in symbols.split(",")}, "currency": "USD"}
+
+    async with Client(transport=server) as client:
+        result = await client.call_tool(
+            "get_stock_latest_quote", {"symbols": "AAPL,MSFT,GOOG,AMZN,NVDA"}
+        )
+
+    assert sorted(requests) == ["AAPL,MSFT", "GOOG,AMZN", "NVDA"]
+    content = result.structured_content
+    assert list(content["quotes"]) == ["AAPL", "MSFT", "GOOG", "AMZN", "NVDA"]
+    assert content["currency"] == "USD"